@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
 import shutil
 import tempfile
+import threading
+import time
+import urllib.error
 import urllib.request
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import IO, Any, Callable, Dict, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, BackgroundTasks, File, HTTPException, Query, UploadFile
 from pydantic import BaseModel
 
 from app.services.pipeline.simple_pipeline import run_tools_for_scan
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:  # pragma: no cover
+    orjson = None
+
 router = APIRouter()
 
 # Project root = .../final-folder/backend/app/api/routes/scans.py
@@ -22,11 +35,14 @@ router = APIRouter()
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 BASE_STORAGE = PROJECT_ROOT / "storage" / "scans"
 BASE_STORAGE.mkdir(parents=True, exist_ok=True)
+GH_CACHE_DIR = PROJECT_ROOT / "storage" / "gh_cache"
+GH_CACHE_MAX_ENTRIES = 32  # cached (owner, repo, ref) archives, LRU
+GH_CACHE_ORPHAN_SEC = 600  # unreferenced archives idle this long are swept
 
 # -----------------------------
 # MVP Ignore/Exclude Rules (LOCKED)
 # -----------------------------
-EXCLUDE_DIRS = {
+EXCLUDE_DIRS = frozenset({
     ".git",
     "node_modules",
     "dist",
@@ -40,10 +56,37 @@ EXCLUDE_DIRS = {
     ".next",
     "target",
     "__MACOSX",
-}
+})
 
-ALLOWED_EXTENSIONS = {".py"}  # MVP locked: Python-only
+ALLOWED_EXTENSIONS = frozenset({".py"})  # MVP locked: Python-only
 MAX_FILE_SIZE_BYTES = 1_048_576  # 1MB
+MAX_TOTAL_BYTES = 104_857_600  # 100MB of kept source per scan (zip-bomb guard)
+COPY_CHUNK_BYTES = 1 << 20  # 1MB
+SPOOL_MAX_BYTES = 8 << 20  # downloads larger than 8MB spill to disk
+EXTRACT_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+GITHUB_URL_RE = re.compile(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$")
+
+# Per-scan workspace layout (created by POST /scans)
+SCAN_SUBDIRS = ("input", "raw", "normalized", "metrics", "score", "ai")
+
+# Background ingestion markers in raw/
+INGEST_PENDING_FILE = "ingestion_pending.json"
+INGEST_ERROR_FILE = "ingestion_error.json"
+INGEST_WAIT_SEC = 300
+INGEST_STALE_SEC = 3600  # a pending marker older than this is treated as failed
+
+# Tells this process apart from an earlier one that reused its pid (e.g. pid 1
+# in a restarted container).
+_PROCESS_TOKEN = uuid4().hex
+
+# Folders whose files feed GET /scans/{scan_id}/results
+RESULT_DIRS = ("raw", "normalized", "metrics", "score", "ai")
+RESULTS_CACHE_MAX = 32  # scans whose last results payload stays in memory
+
+# scan_id -> (fingerprint, payload); one entry per scan, least recent first
+_results_cache: "OrderedDict[str, tuple[tuple, Dict[str, Any]]]" = OrderedDict()
+_results_lock = threading.Lock()
 
 
 # -----------------------------
@@ -65,37 +108,49 @@ class GitHubPayload(BaseModel):
 def _read_json(p: Path) -> Optional[Any]:
     if not p.exists():
         return None
+    if orjson is not None:
+        return orjson.loads(p.read_bytes())
     return json.loads(p.read_text(encoding="utf-8"))
 
 
 def _write_json(p: Path, data: Any) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        p.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     p.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
-def _to_rel_path(path_str: str, scan_path: Path) -> str:
+@lru_cache(maxsize=256)
+def _make_rewriter(scan_prefix: str) -> Callable[[str], str]:
     """
-    Convert an absolute path inside this scan to a clean relative path.
+    Build a path rewriter specialised on scan_prefix (str(scan_path) + os.sep).
+
+    The prefix, its length and the separator fix-up are bound once per scan,
+    so the per-issue call is a startswith + slice with no argument plumbing.
 
     Example:
       /Users/.../storage/scans/<scan_id>/input/test.py -> input/test.py
     """
-    if not path_str:
-        return path_str
+    prefix_len = len(scan_prefix)
+    needs_sep_fix = os.sep != "/"
 
-    try:
-        p = Path(path_str)
-        rel = p.relative_to(scan_path)
-        return rel.as_posix()
-    except Exception:
-        pass
+    def rel(path_str: str) -> str:
+        if not path_str:
+            return path_str
 
-    s = str(path_str)
-    marker = "/input/"
-    if marker in s:
-        return "input/" + s.split(marker, 1)[1]
+        s = str(path_str)
+        if s.startswith(scan_prefix):
+            s = s[prefix_len:]
+            return s.replace(os.sep, "/") if needs_sep_fix else s
 
-    return s
+        _, marker, tail = s.partition("/input/")
+        if marker:
+            return "input/" + tail
+
+        return s
+
+    return rel
 
 
 def _slugify(s: str) -> str:
@@ -110,32 +165,29 @@ def _slugify(s: str) -> str:
     return s or "project"
 
 
-def _normalize_issue_paths(items: Any, scan_path: Path) -> Any:
+def _normalize_issue_paths(items: Any, rel: Callable[[str], str], key: str = "file") -> Any:
     if not isinstance(items, list):
         return items
 
+    # EAFP: reports are almost always well-formed, so skip the per-item
+    # isinstance check and let the rare bad entry raise.
     for item in items:
-        if isinstance(item, dict) and item.get("file"):
-            item["file"] = _to_rel_path(str(item["file"]), scan_path)
+        try:
+            value = item[key]
+        except (TypeError, KeyError, IndexError):
+            continue
+        if value:
+            item[key] = rel(str(value))
 
     return items
 
 
-def _normalize_ai_payload(ai_obj: Any, scan_path: Path) -> Any:
+def _normalize_ai_payload(ai_obj: Any, rel: Callable[[str], str]) -> Any:
     if not isinstance(ai_obj, dict):
         return ai_obj
 
-    top_risky = ai_obj.get("top_risky_issues")
-    if isinstance(top_risky, list):
-        for item in top_risky:
-            if isinstance(item, dict) and item.get("file"):
-                item["file"] = _to_rel_path(str(item["file"]), scan_path)
-
-    issues_enriched = ai_obj.get("issues_enriched")
-    if isinstance(issues_enriched, list):
-        for item in issues_enriched:
-            if isinstance(item, dict) and item.get("file"):
-                item["file"] = _to_rel_path(str(item["file"]), scan_path)
+    _normalize_issue_paths(ai_obj.get("top_risky_issues"), rel)
+    _normalize_issue_paths(ai_obj.get("issues_enriched"), rel)
 
     return ai_obj
 
@@ -147,109 +199,242 @@ def _should_skip_dir(name: str) -> bool:
     return name in EXCLUDE_DIRS
 
 
-def _is_allowed_file(p: Path) -> bool:
-    if not p.is_file():
-        return False
-
-    if p.suffix.lower() not in ALLOWED_EXTENSIONS:
-        return False
-
-    try:
-        if p.stat().st_size > MAX_FILE_SIZE_BYTES:
-            return False
-    except OSError:
-        return False
-
-    return True
-
-
 def _has_any_python_file(input_dir: Path) -> bool:
-    return any(p.suffix.lower() == ".py" for p in input_dir.rglob("*.py"))
+    # Plain existence check, not the ingestion filters: /paste has no size
+    # limit and accepts paths like build/x.py, which flake8/bandit still scan.
+    # Returns on the first .py entry without listing the rest of its folder.
+    stack = [str(input_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(".py"):
+                        return True
+        except OSError:
+            continue
+    return False
 
 
-def _ingest_extracted_tree(extract_dir: Path, input_dir: Path) -> Dict[str, Any]:
+def _zip_single_root(infos: list[zipfile.ZipInfo]) -> str:
     """
-    Walk extracted tree, apply exclude rules + allowed extensions + max size,
-    and copy into input/ while preserving relative paths.
-
-    If the zip extracts into a single top-level folder (common GitHub zips),
-    strip that folder so paths become clean:
+    If every visible entry lives under one top-level folder (common GitHub
+    zips), return that folder name so it can be stripped:
       backend/... instead of repo-main/backend/...
     """
+    top_dirs: set[str] = set()
+    for zi in infos:
+        head, sep, _ = zi.filename.partition("/")
+        if _should_skip_dir(head):
+            continue
+        if not sep:
+            return ""
+        top_dirs.add(head)
 
-    def _effective_root(root: Path) -> Path:
-        try:
-            children = list(root.iterdir())
-        except Exception:
-            return root
-
-        visible = []
-        for child in children:
-            name = child.name
-            if _should_skip_dir(name):
-                continue
-            if name == "__MACOSX":
-                continue
-            visible.append(child)
+    if len(top_dirs) == 1:
+        return next(iter(top_dirs))
+
+    return ""
 
-        dirs = [p for p in visible if p.is_dir()]
-        files = [p for p in visible if p.is_file()]
 
-        if len(files) == 0 and len(dirs) == 1:
-            return dirs[0]
+def _ingest_zip(zf: zipfile.ZipFile, input_dir: Path) -> Dict[str, Any]:
+    """
+    Stream allowed entries of an opened zip straight into input/, preserving
+    relative paths.
 
-        return root
+    Filtering (exclude rules + allowed extensions + per-file and total size
+    caps) only looks at the central directory, so skipped entries are never
+    decompressed.
+    """
+    infos = zf.infolist()
+    root = _zip_single_root(infos)
+    root_prefix = root + "/" if root else ""
+    root_len = len(root_prefix)
+    splitext = os.path.splitext
 
-    kept = 0
     skipped = 0
+    total_bytes = 0
     skipped_samples: list[dict[str, str]] = []
+    jobs: list[tuple[zipfile.ZipInfo, Path]] = []
+    made_dirs: set[Path] = set()
 
-    base = _effective_root(extract_dir)
+    for zi in infos:
+        if zi.is_dir():
+            continue
+
+        name = zi.filename
+        if root_prefix:
+            if not name.startswith(root_prefix):
+                continue
+            name = name[root_len:]
 
-    for p in base.rglob("*"):
-        if any(_should_skip_dir(part) for part in p.parts):
+        parts = name.split("/")
+        if not EXCLUDE_DIRS.isdisjoint(parts):
             continue
 
-        if p.is_dir():
+        # Never write outside input/ (zip-slip).
+        if name.startswith("/") or ".." in parts:
             continue
 
-        if not _is_allowed_file(p):
-            skipped += 1
+        reason = None
+        if zi.file_size > MAX_FILE_SIZE_BYTES:
+            reason = "too_large"
+        elif splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+            reason = "not_allowed"
+        elif total_bytes + zi.file_size > MAX_TOTAL_BYTES:
+            reason = "total_limit"
 
+        if reason:
+            skipped += 1
             if len(skipped_samples) < 25:
-                reason = "not_allowed"
-                try:
-                    if p.stat().st_size > MAX_FILE_SIZE_BYTES:
-                        reason = "too_large"
-                except OSError:
-                    reason = "stat_failed"
-
-                try:
-                    rel_name = str(p.relative_to(base))
-                except Exception:
-                    rel_name = str(p)
-
-                skipped_samples.append({"file": rel_name, "reason": reason})
+                skipped_samples.append({"file": name, "reason": reason})
             continue
 
-        rel = p.relative_to(base)
-        dest = input_dir / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(p, dest)
-        kept += 1
+        # zipfile never inflates past the declared file_size, so the header
+        # sizes are a hard bound on what gets written.
+        total_bytes += zi.file_size
+
+        dest = input_dir / name
+        if dest.parent not in made_dirs:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(dest.parent)
+        jobs.append((zi, dest))
+
+    # Inflate releases the GIL and member reads are serialized by zipfile
+    # itself, so extraction overlaps well across threads. Only open/close
+    # touch unlocked ZipFile state, so those go through our own lock.
+    handle_lock = threading.Lock()
+
+    def _extract_one(job: tuple[zipfile.ZipInfo, Path]) -> None:
+        zi, dest = job
+        with handle_lock:
+            src = zf.open(zi)
+        try:
+            with dest.open("wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_BYTES)
+        finally:
+            with handle_lock:
+                src.close()
+
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as pool:
+        list(pool.map(_extract_one, jobs))
 
     return {
-        "kept": kept,
+        "kept": len(jobs),
         "skipped": skipped,
         "max_file_size_bytes": MAX_FILE_SIZE_BYTES,
+        "total_bytes": total_bytes,
+        "max_total_bytes": MAX_TOTAL_BYTES,
         "allowed_extensions": sorted(ALLOWED_EXTENSIONS),
         "excluded_dirs": sorted(EXCLUDE_DIRS),
         "skipped_samples": skipped_samples,
-        "stripped_single_root": bool(base != extract_dir),
-        "root_used": base.name,
+        "stripped_single_root": bool(root),
+        # "extracted" was the temp extraction folder name; kept so trend
+        # project keys for multi-root zips do not change.
+        "root_used": root or "extracted",
     }
 
 
+def _mark_ingestion_pending(raw_dir: Path, source: Dict[str, Any]) -> None:
+    (raw_dir / INGEST_ERROR_FILE).unlink(missing_ok=True)
+    _write_json(
+        raw_dir / INGEST_PENDING_FILE,
+        {
+            "source": source,
+            "started_at": time.time(),
+            "pid": os.getpid(),
+            "process": _PROCESS_TOKEN,
+        },
+    )
+
+
+def _run_ingestion(
+    raw_dir: Path,
+    input_dir: Path,
+    open_zip: Callable[[], IO[bytes]],
+    source: Dict[str, Any],
+) -> None:
+    """
+    Background half of upload_zip / ingest_github.
+    Writes raw/ingestion.json on success or raw/ingestion_error.json on
+    failure, then clears the pending marker.
+    """
+    try:
+        with open_zip() as spool, zipfile.ZipFile(spool, "r") as zf:
+            ingestion_summary = _ingest_zip(zf, input_dir)
+        ingestion_summary["source"] = source
+        _write_json(raw_dir / "ingestion.json", ingestion_summary)
+    except zipfile.BadZipFile:
+        _write_json(raw_dir / INGEST_ERROR_FILE, {"error": "Not a valid zip file", "source": source})
+    except Exception as exc:
+        detail = getattr(exc, "detail", None) or str(exc)
+        _write_json(raw_dir / INGEST_ERROR_FILE, {"error": detail, "source": source})
+    finally:
+        (raw_dir / INGEST_PENDING_FILE).unlink(missing_ok=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except (OSError, OverflowError):
+        return False
+    return True
+
+
+def _ingestion_pending(raw_dir: Path) -> bool:
+    """
+    True while a background ingestion is in flight.
+
+    The marker is only cleared by the ingesting process, so one left behind
+    by a dead process (or older than INGEST_STALE_SEC) is turned into
+    raw/ingestion_error.json instead of reading as INGESTING forever.
+    """
+    pending = raw_dir / INGEST_PENDING_FILE
+    try:
+        started_at = pending.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+    owner_gone = False
+    source = None
+    try:
+        marker = _read_json(pending)
+        source = marker.get("source")
+        started_at = float(marker["started_at"])
+        pid = int(marker["pid"])
+        if pid == os.getpid():
+            owner_gone = marker.get("process") != _PROCESS_TOKEN
+        else:
+            owner_gone = not _pid_alive(pid)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        # Legacy or half-written marker: fall back to the file's age.
+        pass
+
+    if not owner_gone and time.time() - started_at < INGEST_STALE_SEC:
+        return True
+
+    _write_json(raw_dir / INGEST_ERROR_FILE, {"error": "Ingestion was interrupted", "source": source})
+    pending.unlink(missing_ok=True)
+    return False
+
+
+def _wait_for_ingestion(raw_dir: Path, timeout_sec: float = INGEST_WAIT_SEC) -> bool:
+    """Block until no background ingestion is pending. False on timeout."""
+    deadline = time.monotonic() + timeout_sec
+    while _ingestion_pending(raw_dir):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
 # -----------------------------
 # GitHub download helpers
 # -----------------------------
@@ -262,38 +447,164 @@ def _parse_github_repo(repo_url: str) -> tuple[str, str]:
     Returns:
       (owner, repo)
     """
-    s = repo_url.strip()
-    match = re.match(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$", s)
+    match = GITHUB_URL_RE.match(repo_url.strip())
     if not match:
         raise HTTPException(status_code=400, detail="Invalid GitHub repo URL")
 
     return match.group(1), match.group(2)
 
 
-def _download_github_zip(owner: str, repo: str, ref: str, out_path: Path) -> None:
+def _download_github_zip(owner: str, repo: str, ref: str) -> IO[bytes]:
     """
     Download a zipball using GitHub API (public repos).
     Rate limits apply.
+
+    Archives served with an ETag / Last-Modified are cached per
+    (owner, repo, ref) under storage/gh_cache/ and revalidated with a
+    conditional GET, so an unchanged ref answers 304 and is not downloaded
+    again. Other archives are spooled in chunks: small ones stay in memory,
+    large ones roll over to a temp file.
+
+    Each cached archive is written once under a unique name and never
+    modified; <key>.json names it together with its validators and is
+    swapped in with a single rename, so a reader always gets a matching
+    archive/validator pair even with concurrent ingests of the same ref.
+    The cache is bounded to GH_CACHE_MAX_ENTRIES refs (see _sweep_gh_cache).
+
+    Returns a readable file positioned at the start of the archive.
     """
     zip_url = f"https://api.github.com/repos/{owner}/{repo}/zipball/{ref}"
 
-    req = urllib.request.Request(
-        zip_url,
-        headers={
-            "User-Agent": "final-folder-mvp-scanner",
-            "Accept": "application/vnd.github+json",
-        },
-        method="GET",
-    )
+    cache_key = hashlib.sha256(f"{owner}/{repo}@{ref}".encode("utf-8")).hexdigest()
+    entry_path = GH_CACHE_DIR / f"{cache_key}.json"
+
+    headers = {
+        "User-Agent": "final-folder-mvp-scanner",
+        "Accept": "application/vnd.github+json",
+    }
 
+    tmp_path: Optional[Path] = None
+    cached: Optional[IO[bytes]] = None
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            out_path.write_bytes(resp.read())
+        # Hold the archive open before revalidating: a concurrent ingest may
+        # replace the entry, but this handle still matches these validators.
+        try:
+            entry = _read_json(entry_path)
+            cached = (GH_CACHE_DIR / Path(entry["archive"]).name).open("rb")
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        except (OSError, ValueError, KeyError, TypeError):
+            cached = None
+
+        req = urllib.request.Request(zip_url, headers=headers, method="GET")
+        try:
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                fresh = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                }
+                if not any(fresh.values()):
+                    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+                    shutil.copyfileobj(resp, spool, COPY_CHUNK_BYTES)
+                    spool.seek(0)
+                    return spool
+
+                GH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                archive_path = GH_CACHE_DIR / f"{cache_key}.{uuid4().hex}.zip"
+                tmp_path = archive_path
+                with archive_path.open("wb") as dst:
+                    shutil.copyfileobj(resp, dst, COPY_CHUNK_BYTES)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 304 and cached is not None:
+                hit, cached = cached, None
+                try:
+                    os.utime(entry_path)  # LRU: mark as recently used
+                except OSError:
+                    pass
+                return hit
+            raise
+
+        result = archive_path.open("rb")
+        entry_tmp = GH_CACHE_DIR / f"{cache_key}.{uuid4().hex}.tmp"
+        try:
+            _write_json(entry_tmp, {**fresh, "archive": archive_path.name})
+            os.replace(entry_tmp, entry_path)
+        except OSError:
+            # Caching is best effort; the download itself succeeded.
+            entry_tmp.unlink(missing_ok=True)
+            archive_path.unlink(missing_ok=True)
+            return result
+        tmp_path = None
+
+        if cached is not None:
+            # Superseded archive; open handles keep their data until closed.
+            previous = Path(cached.name)
+            cached.close()
+            cached = None
+            if previous != archive_path:
+                previous.unlink(missing_ok=True)
+        _sweep_gh_cache()
+        return result
     except Exception as exc:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to download GitHub zip: {exc}",
         ) from exc
+    finally:
+        if cached is not None:
+            cached.close()
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _sweep_gh_cache(keep: int = GH_CACHE_MAX_ENTRIES) -> None:
+    """
+    Drop the least recently used entries beyond `keep` (by <key>.json mtime)
+    with their archives, then delete archives no entry points to, e.g. the
+    loser of two concurrent downloads of one ref.
+
+    Unreferenced files are only removed once idle for GH_CACHE_ORPHAN_SEC, so
+    a download still being written by another request is left alone.
+    """
+    entries = []
+    others = []
+    try:
+        with os.scandir(GH_CACHE_DIR) as it:
+            for e in it:
+                if not e.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    mtime_ns = e.stat(follow_symlinks=False).st_mtime_ns
+                except OSError:
+                    continue
+                if e.name.endswith(".json"):
+                    entries.append((mtime_ns, e.path))
+                else:
+                    others.append((mtime_ns, e.path))
+    except OSError:
+        return
+
+    entries.sort()
+    evicted = entries[: max(0, len(entries) - keep)]
+    referenced: set[str] = set()
+    for i, (_, path) in enumerate(entries):
+        try:
+            archive = Path(str(_read_json(Path(path))["archive"])).name
+        except (OSError, ValueError, KeyError, TypeError):
+            archive = None
+        if i < len(evicted):
+            Path(path).unlink(missing_ok=True)
+            if archive:
+                (GH_CACHE_DIR / archive).unlink(missing_ok=True)
+        elif archive:
+            referenced.add(archive)
+
+    cutoff_ns = time.time_ns() - GH_CACHE_ORPHAN_SEC * 1_000_000_000
+    for mtime_ns, path in others:
+        if mtime_ns < cutoff_ns and os.path.basename(path) not in referenced:
+            Path(path).unlink(missing_ok=True)
 
 
 # -----------------------------
@@ -303,10 +614,10 @@ def _download_github_zip(owner: str, repo: str, ref: str, out_path: Path) -> Non
 def create_scan() -> Dict[str, Any]:
     """Creates an isolated scan workspace."""
     scan_id = str(uuid4())
-    scan_path = BASE_STORAGE / scan_id
+    base = os.path.join(BASE_STORAGE, scan_id)
 
-    for folder in ["input", "raw", "normalized", "metrics", "score", "ai"]:
-        (scan_path / folder).mkdir(parents=True, exist_ok=True)
+    for folder in SCAN_SUBDIRS:
+        os.makedirs(os.path.join(base, folder), exist_ok=True)
 
     return {"scan_id": scan_id, "status": "CREATED"}
 
@@ -318,6 +629,11 @@ def scan_status(scan_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=404, detail="Scan not found")
 
     raw_dir = scan_path / "raw"
+    if _ingestion_pending(raw_dir):
+        return {"scan_id": scan_id, "status": "INGESTING"}
+    if (raw_dir / INGEST_ERROR_FILE).exists():
+        return {"scan_id": scan_id, "status": "FAILED"}
+
     done = (raw_dir / "runner_done.json").exists()
     return {"scan_id": scan_id, "status": "DONE" if done else "READY"}
 
@@ -346,13 +662,18 @@ def paste_code(scan_id: str, payload: PastePayload) -> Dict[str, Any]:
     return {"scan_id": scan_id, "saved": fname}
 
 
-@router.post("/scans/{scan_id}/upload_zip")
-def upload_zip(scan_id: str, file: UploadFile = File(...)) -> Dict[str, Any]:
+@router.post("/scans/{scan_id}/upload_zip", status_code=202)
+def upload_zip(
+    scan_id: str,
+    background: BackgroundTasks,
+    file: UploadFile = File(...),
+) -> Dict[str, Any]:
     """
-    MVP: Upload a project zip, extract, apply exclude rules,
-    and copy allowed .py files into input/.
+    MVP: Upload a project zip, apply exclude rules,
+    and stream allowed .py files into input/.
 
-    Writes raw/ingestion.json summary.
+    Returns 202 once the upload is spooled; ingestion runs in the background
+    and writes raw/ingestion.json (or raw/ingestion_error.json).
     """
     scan_path = BASE_STORAGE / scan_id
     if not scan_path.exists():
@@ -361,92 +682,71 @@ def upload_zip(scan_id: str, file: UploadFile = File(...)) -> Dict[str, Any]:
     if not file.filename or not file.filename.lower().endswith(".zip"):
         raise HTTPException(status_code=400, detail="Only .zip uploads are supported")
 
+    # create_scan already made input/ and raw/
     input_dir = scan_path / "input"
     raw_dir = scan_path / "raw"
-    input_dir.mkdir(parents=True, exist_ok=True)
-    raw_dir.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as tmp:
-        tmp_path = Path(tmp)
-        zip_path = tmp_path / "upload.zip"
-        zip_path.write_bytes(file.file.read())
+    # The upload is closed once the response is sent, so copy it into our own
+    # spool for the background task.
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    shutil.copyfileobj(file.file, spool, COPY_CHUNK_BYTES)
+    spool.seek(0)
 
-        extract_dir = tmp_path / "extracted"
-        extract_dir.mkdir(parents=True, exist_ok=True)
+    if not zipfile.is_zipfile(spool):
+        spool.close()
+        raise HTTPException(status_code=400, detail="Invalid zip file")
+    spool.seek(0)
 
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zf:
-                zf.extractall(extract_dir)
-        except zipfile.BadZipFile as exc:
-            raise HTTPException(status_code=400, detail="Invalid zip file") from exc
-
-        ingestion_summary = _ingest_extracted_tree(extract_dir, input_dir)
-        ingestion_summary["source"] = {"type": "zip", "filename": file.filename}
-        _write_json(raw_dir / "ingestion.json", ingestion_summary)
+    source = {"type": "zip", "filename": file.filename}
+    _mark_ingestion_pending(raw_dir, source)
+    background.add_task(_run_ingestion, raw_dir, input_dir, lambda: spool, source)
 
-    return {
-        "scan_id": scan_id,
-        "status": "UPLOADED",
-        "kept": ingestion_summary["kept"],
-        "skipped": ingestion_summary["skipped"],
-        "stripped_root": ingestion_summary.get("stripped_single_root", False),
-    }
+    return {"scan_id": scan_id, "status": "INGESTING"}
 
 
-@router.post("/scans/{scan_id}/github")
-def ingest_github(scan_id: str, payload: GitHubPayload) -> Dict[str, Any]:
+@router.post("/scans/{scan_id}/github", status_code=202)
+def ingest_github(
+    scan_id: str,
+    payload: GitHubPayload,
+    background: BackgroundTasks,
+) -> Dict[str, Any]:
     """
     MVP: Download a public GitHub repo zipball and ingest into input/.
 
-    Writes raw/ingestion.json summary.
+    Returns 202 right away; download + ingestion run in the background
+    and write raw/ingestion.json (or raw/ingestion_error.json).
     """
     scan_path = BASE_STORAGE / scan_id
     if not scan_path.exists():
         raise HTTPException(status_code=404, detail="Scan not found")
 
+    # create_scan already made input/ and raw/
     input_dir = scan_path / "input"
     raw_dir = scan_path / "raw"
-    input_dir.mkdir(parents=True, exist_ok=True)
-    raw_dir.mkdir(parents=True, exist_ok=True)
 
     owner, repo = _parse_github_repo(payload.repo_url)
 
-    with tempfile.TemporaryDirectory() as tmp:
-        tmp_path = Path(tmp)
-        zip_path = tmp_path / "repo.zip"
-
-        _download_github_zip(owner, repo, payload.ref, zip_path)
-
-        extract_dir = tmp_path / "extracted"
-        extract_dir.mkdir(parents=True, exist_ok=True)
-
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zf:
-                zf.extractall(extract_dir)
-        except zipfile.BadZipFile as exc:
-            raise HTTPException(
-                status_code=400,
-                detail="Downloaded file is not a valid zip",
-            ) from exc
-
-        ingestion_summary = _ingest_extracted_tree(extract_dir, input_dir)
-        ingestion_summary["source"] = {
-            "type": "github",
-            "repo_url": payload.repo_url,
-            "owner": owner,
-            "repo": repo,
-            "ref": payload.ref,
-        }
-        _write_json(raw_dir / "ingestion.json", ingestion_summary)
+    source = {
+        "type": "github",
+        "repo_url": payload.repo_url,
+        "owner": owner,
+        "repo": repo,
+        "ref": payload.ref,
+    }
+    _mark_ingestion_pending(raw_dir, source)
+    background.add_task(
+        _run_ingestion,
+        raw_dir,
+        input_dir,
+        lambda: _download_github_zip(owner, repo, payload.ref),
+        source,
+    )
 
     return {
         "scan_id": scan_id,
-        "status": "GITHUB_INGESTED",
-        "kept": ingestion_summary["kept"],
-        "skipped": ingestion_summary["skipped"],
+        "status": "INGESTING",
         "repo": f"{owner}/{repo}",
         "ref": payload.ref,
-        "stripped_root": ingestion_summary.get("stripped_single_root", False),
     }
 
 
@@ -471,6 +771,19 @@ def start_scan(
     raw_dir = scan_path / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
+    # upload_zip / github ingest in the background; clients start right away.
+    if not _wait_for_ingestion(raw_dir):
+        return {"scan_id": scan_id, "status": "FAILED", "reason": "INGESTION_TIMEOUT"}
+
+    ingestion_error = _read_json(raw_dir / INGEST_ERROR_FILE)
+    if ingestion_error:
+        return {
+            "scan_id": scan_id,
+            "status": "FAILED",
+            "reason": "INGESTION_ERROR",
+            "error": ingestion_error.get("error"),
+        }
+
     if not input_dir.exists() or not _has_any_python_file(input_dir):
         _write_json(
             raw_dir / "runner_warnings.json",
@@ -505,6 +818,50 @@ def get_scan_results(scan_id: str) -> Dict[str, Any]:
     if not scan_path.exists():
         raise HTTPException(status_code=404, detail="Scan not found")
 
+    fingerprint = _scan_fingerprint(scan_path)
+    with _results_lock:
+        cached = _results_cache.get(scan_id)
+        if cached is not None and cached[0] == fingerprint:
+            _results_cache.move_to_end(scan_id)
+            return cached[1]
+
+    payload = _load_scan_results(scan_id)
+    with _results_lock:
+        _results_cache[scan_id] = (fingerprint, payload)
+        _results_cache.move_to_end(scan_id)
+        while len(_results_cache) > RESULTS_CACHE_MAX:
+            _results_cache.popitem(last=False)
+    return payload
+
+
+def _scan_fingerprint(scan_path: Path) -> tuple:
+    """
+    (name, mtime_ns, size) of every artifact the results payload is built from.
+    One scandir per folder instead of a stat + read per JSON file.
+    """
+    entries = []
+    for folder in RESULT_DIRS:
+        try:
+            with os.scandir(scan_path / folder) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        entries.append((folder, entry.name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            continue
+    entries.sort()
+    return tuple(entries)
+
+
+def _load_scan_results(scan_id: str) -> Dict[str, Any]:
+    """
+    Builds the results payload. get_scan_results keeps the latest one per scan
+    with its artifact fingerprint, so polls between pipeline writes skip the
+    JSON parsing. The returned dict is shared between requests and must not be
+    mutated.
+    """
+    scan_path = BASE_STORAGE / scan_id
+
     raw_dir = scan_path / "raw"
     norm_dir = scan_path / "normalized"
     metrics_dir = scan_path / "metrics"
@@ -521,6 +878,7 @@ def get_scan_results(scan_id: str) -> Dict[str, Any]:
         "runner_warnings": _read_json(raw_dir / "runner_warnings.json"),
         "pipeline_error": _read_json(raw_dir / "pipeline_error.json"),
         "postprocess_error": _read_json(raw_dir / "postprocess_error.json"),
+        "ingestion_error": _read_json(raw_dir / INGEST_ERROR_FILE),
     }
 
     normalized: Dict[str, Any] = {
@@ -539,76 +897,41 @@ def get_scan_results(scan_id: str) -> Dict[str, Any]:
     # -----------------------------
     # Fix raw paths -> relative
     # -----------------------------
-    if isinstance(raw.get("flake8"), dict):
-        new_flake8 = {}
-        for fname, items in raw["flake8"].items():
-            rel_name = _to_rel_path(fname, scan_path)
+    rel = _make_rewriter(str(scan_path) + os.sep)
 
-            if isinstance(items, list):
-                for item in items:
-                    if isinstance(item, dict) and "filename" in item:
-                        item["filename"] = _to_rel_path(item["filename"], scan_path)
-
-            new_flake8[rel_name] = items
-
-        raw["flake8"] = new_flake8
+    flake8_raw = raw["flake8"]
+    if isinstance(flake8_raw, dict):
+        raw["flake8"] = {
+            rel(fname): _normalize_issue_paths(items, rel, "filename")
+            for fname, items in flake8_raw.items()
+        }
 
-    bandit_raw = raw.get("bandit")
+    bandit_raw = raw["bandit"]
     if isinstance(bandit_raw, dict):
-        results_list = bandit_raw.get("results")
-        if isinstance(results_list, list):
-            for item in results_list:
-                if isinstance(item, dict) and "filename" in item:
-                    item["filename"] = _to_rel_path(item["filename"], scan_path)
+        _normalize_issue_paths(bandit_raw.get("results"), rel, "filename")
 
         metrics_obj = bandit_raw.get("metrics")
         if isinstance(metrics_obj, dict):
-            new_metrics = {}
-            for key, value in metrics_obj.items():
-                if isinstance(key, str) and (key.startswith("/") or "/input/" in key):
-                    new_metrics[_to_rel_path(key, scan_path)] = value
-                else:
-                    new_metrics[key] = value
-            bandit_raw["metrics"] = new_metrics
-
-    fl_norm = normalized.get("flake8")
-    if isinstance(fl_norm, dict) and isinstance(fl_norm.get("issues"), list):
-        for item in fl_norm["issues"]:
-            if isinstance(item, dict) and "file" in item:
-                item["file"] = _to_rel_path(item["file"], scan_path)
+            bandit_raw["metrics"] = {
+                (rel(key) if key.startswith("/") or "/input/" in key else key): value
+                for key, value in metrics_obj.items()
+            }
 
-    bd_norm = normalized.get("bandit")
-    if isinstance(bd_norm, dict) and isinstance(bd_norm.get("issues"), list):
-        for item in bd_norm["issues"]:
-            if isinstance(item, dict) and "file" in item:
-                item["file"] = _to_rel_path(item["file"], scan_path)
+    for tool_norm in normalized.values():
+        if isinstance(tool_norm, dict):
+            _normalize_issue_paths(tool_norm.get("issues"), rel)
 
-    _normalize_issue_paths(unified_issues, scan_path)
+    _normalize_issue_paths(unified_issues, rel)
 
     if isinstance(metrics, dict):
-        top_refactor = metrics.get("top_refactor_priority")
-        if isinstance(top_refactor, list):
-            for item in top_refactor:
-                if isinstance(item, dict) and item.get("file"):
-                    item["file"] = _to_rel_path(str(item["file"]), scan_path)
+        _normalize_issue_paths(metrics.get("top_refactor_priority"), rel)
+        _normalize_issue_paths(metrics.get("top_files"), rel)
 
         heatmap = metrics.get("heatmap")
         if isinstance(heatmap, dict):
-            new_heatmap = {}
-            for key, value in heatmap.items():
-                if isinstance(key, str):
-                    new_heatmap[_to_rel_path(key, scan_path)] = value
-                else:
-                    new_heatmap[key] = value
-            metrics["heatmap"] = new_heatmap
-
-        top_files = metrics.get("top_files")
-        if isinstance(top_files, list):
-            for item in top_files:
-                if isinstance(item, dict) and item.get("file"):
-                    item["file"] = _to_rel_path(str(item["file"]), scan_path)
+            metrics["heatmap"] = {rel(key): value for key, value in heatmap.items()}
 
-    ai_summary = _normalize_ai_payload(ai_summary, scan_path)
+    ai_summary = _normalize_ai_payload(ai_summary, rel)
 
     project_key = ingestion_obj.get("project_key")
     project_name = ingestion_obj.get("project_name")
@@ -628,8 +951,3 @@ def get_scan_results(scan_id: str) -> Dict[str, Any]:
             "summary": ai_summary,
         },
     }
-
-
-@router.get("/health")
-def health() -> Dict[str, Any]:
-    return {"status": "ok"}
\ No newline at end of file
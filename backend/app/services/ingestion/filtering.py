@@ -1,12 +1,12 @@
 from __future__ import annotations
 from pathlib import Path
 
-EXCLUDE_DIRS = {
+EXCLUDE_DIRS = frozenset({
     ".git", "node_modules", "dist", "build", ".venv", "venv", "__pycache__",
     ".mypy_cache", "coverage", ".pytest_cache", ".next", "target",
-}
+})
 
-ALLOWED_EXTENSIONS = {".py"}  # MVP locked
+ALLOWED_EXTENSIONS = frozenset({".py"})  # MVP locked
 MAX_FILE_SIZE_BYTES = 1_048_576  # 1MB
 
 
@@ -24,4 +24,4 @@ def is_allowed_file(p: Path) -> bool:
             return False
     except OSError:
         return False
-    return True
\ No newline at end of file
+    return True
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-import io
 import json
 import re
 import shutil
+import tempfile
 import zipfile
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import IO, Optional
 from urllib.request import urlopen, Request
 
 from .ingest_utils import IngestRules, is_allowed_file, is_excluded_path
 
+try:
+    import orjson  # optional: much faster JSON serialize
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+_GITHUB_URL_RE = re.compile(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$")
+
 
 @dataclass
 class IngestionReport:
@@ -31,13 +39,17 @@ def _parse_github_repo(repo_url: str) -> tuple[str, str]:
       https://github.com/OWNER/REPO.git
     Returns: (owner, repo)
     """
-    m = re.match(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$", repo_url.strip())
+    m = _GITHUB_URL_RE.match(repo_url.strip())
     if not m:
         raise ValueError("Invalid GitHub repo URL. Expected like: https://github.com/OWNER/REPO")
     return m.group(1), m.group(2)
 
 
-def _download_github_zip(owner: str, repo: str, ref: str) -> bytes:
+def _download_github_zip(owner: str, repo: str, ref: str) -> IO[bytes]:
+    """
+    Stream the archive into a spooled temp file (in memory up to 8MB, then on
+    disk) and return it rewound, ready for zipfile.ZipFile.
+    """
     # GitHub source zip:
     # https://github.com/{owner}/{repo}/archive/refs/heads/{ref}.zip
     # For tags/commits, GitHub still supports /archive/{ref}.zip in many cases,
@@ -49,12 +61,17 @@ def _download_github_zip(owner: str, repo: str, ref: str) -> bytes:
 
     last_err: Optional[Exception] = None
     for url in url_candidates:
+        spool = tempfile.SpooledTemporaryFile(max_size=8 << 20)
         try:
             req = Request(url, headers={"User-Agent": "final-folder-scanner"})
             with urlopen(req, timeout=30) as resp:
-                return resp.read()
+                shutil.copyfileobj(resp, spool, 1 << 20)
         except Exception as e:
+            spool.close()
             last_err = e
+            continue
+        spool.seek(0)
+        return spool
 
     raise RuntimeError(f"Failed to download GitHub zip for {owner}/{repo}@{ref}: {last_err}")
 
@@ -72,69 +89,69 @@ def ingest_github_repo_to_input(
     rules = rules or IngestRules()
 
     owner, repo = _parse_github_repo(repo_url)
-    zip_bytes = _download_github_zip(owner, repo, ref)
+    spool = _download_github_zip(owner, repo, ref)
 
     # Clear input dir first (fresh ingestion)
     if scan_input_dir.exists():
         shutil.rmtree(scan_input_dir)
     scan_input_dir.mkdir(parents=True, exist_ok=True)
-
-    # Extract zip into a temp folder inside raw/
-    tmp_dir = scan_raw_dir / "tmp_extract"
-    if tmp_dir.exists():
-        shutil.rmtree(tmp_dir)
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-
-    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
-        zf.extractall(tmp_dir)
-
-    # GitHub zip contains a single top folder like repo-ref/
-    extracted_roots = [p for p in tmp_dir.iterdir() if p.is_dir()]
-    if not extracted_roots:
-        raise RuntimeError("Downloaded zip had no root folder.")
-    root = extracted_roots[0]
-
-    base = root
-    if subdir:
-        base = root / subdir
-        if not base.exists():
-            raise ValueError(f"subdir not found inside repo zip: {subdir}")
+    input_root = scan_input_dir.resolve()
 
     kept = 0
     skipped = 0
     skipped_samples: list[dict] = []
 
-    # Copy allowed files into input/ preserving relative structure
-    for path in base.rglob("*"):
-        if path.is_dir():
-            continue
-
-        rel = path.relative_to(root)  # keep repo root relative structure
-        if is_excluded_path(rel, rules):
-            skipped += 1
-            if len(skipped_samples) < skipped_sample_limit:
-                skipped_samples.append({"file": str(rel), "reason": "excluded_dir"})
-            continue
-
-        if not is_allowed_file(path, rules):
-            skipped += 1
-            if len(skipped_samples) < skipped_sample_limit:
-                reason = "not_allowed"
-                try:
-                    if path.stat().st_size > rules.max_file_size_bytes:
+    # Stream entries straight from the zip into input/. Filtering only needs
+    # the central directory, so skipped entries are never decompressed.
+    with spool, zipfile.ZipFile(spool) as zf:
+        infos = zf.infolist()
+
+        # GitHub zip contains a single top folder like repo-ref/
+        root = next((zi.filename.split("/", 1)[0] for zi in infos if "/" in zi.filename), None)
+        if not root:
+            raise RuntimeError("Downloaded zip had no root folder.")
+        root_prefix = root + "/"
+
+        base_prefix = root_prefix
+        if subdir:
+            base_prefix = root_prefix + subdir.strip("/") + "/"
+            if not any(zi.filename.startswith(base_prefix) for zi in infos):
+                raise ValueError(f"subdir not found inside repo zip: {subdir}")
+
+        # Copy allowed files into input/ preserving relative structure
+        for zi in infos:
+            if zi.is_dir() or not zi.filename.startswith(base_prefix):
+                continue
+
+            rel = zi.filename[len(root_prefix):]  # keep repo root relative structure
+            rel_parts = tuple(rel.split("/"))
+            # Never write outside input/ (zip-slip): an empty segment means an
+            # absolute or "a//b" path, which pathlib would re-anchor at "/".
+            if ".." in rel_parts or "" in rel_parts:
+                continue
+
+            if is_excluded_path(rel_parts, rules):
+                skipped += 1
+                if len(skipped_samples) < skipped_sample_limit:
+                    skipped_samples.append({"file": rel, "reason": "excluded_dir"})
+                continue
+
+            if not is_allowed_file(rel_parts[-1], zi.file_size, rules):
+                skipped += 1
+                if len(skipped_samples) < skipped_sample_limit:
+                    reason = "not_allowed"
+                    if zi.file_size > rules.max_file_size_bytes:
                         reason = "too_large"
-                except FileNotFoundError:
-                    reason = "missing"
-                skipped_samples.append({"file": str(rel), "reason": reason})
-            continue
-
-        dest = scan_input_dir / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(path, dest)
-        kept += 1
+                    skipped_samples.append({"file": rel, "reason": reason})
+                continue
 
-    # Clean temp
-    shutil.rmtree(tmp_dir, ignore_errors=True)
+            dest = scan_input_dir / rel
+            if not dest.resolve().is_relative_to(input_root):
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with zf.open(zi) as src, dest.open("wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            kept += 1
 
     report = IngestionReport(
         kept=kept,
@@ -155,6 +172,10 @@ def ingest_github_repo_to_input(
 
     # Save ingestion report in raw/
     scan_raw_dir.mkdir(parents=True, exist_ok=True)
-    (scan_raw_dir / "ingestion.json").write_text(json.dumps(asdict(report), indent=2), encoding="utf-8")
+    report_path = scan_raw_dir / "ingestion.json"
+    if orjson is not None:
+        report_path.write_bytes(orjson.dumps(asdict(report), option=orjson.OPT_INDENT_2))
+    else:
+        report_path.write_text(json.dumps(asdict(report), indent=2), encoding="utf-8")
 
     return report
\ No newline at end of file
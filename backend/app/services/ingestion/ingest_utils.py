@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import os
+import re
 from dataclasses import dataclass
-from pathlib import Path
+from fnmatch import translate
+from functools import cached_property
+from typing import Optional, Pattern, Tuple
 
 
-DEFAULT_EXCLUDED_DIRS = {
+DEFAULT_EXCLUDED_DIRS = frozenset({
     ".git",
     "node_modules",
     "dist",
@@ -17,37 +21,61 @@ DEFAULT_EXCLUDED_DIRS = {
     ".pytest_cache",
     ".next",
     "target",
-}
+})
 
-DEFAULT_ALLOWED_EXTENSIONS = {".py"}
+DEFAULT_ALLOWED_EXTENSIONS = frozenset({".py"})
 DEFAULT_MAX_FILE_SIZE_BYTES = 1 * 1024 * 1024  # 1MB
 
+_GLOB_CHARS = frozenset("*?[")
+
 
 @dataclass(frozen=True)
 class IngestRules:
-    excluded_dirs: set[str] = None  # type: ignore[assignment]
-    allowed_extensions: set[str] = None  # type: ignore[assignment]
+    excluded_dirs: frozenset[str] = None  # type: ignore[assignment]
+    allowed_extensions: frozenset[str] = None  # type: ignore[assignment]
     max_file_size_bytes: int = DEFAULT_MAX_FILE_SIZE_BYTES
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "excluded_dirs", self.excluded_dirs or set(DEFAULT_EXCLUDED_DIRS))
-        object.__setattr__(self, "allowed_extensions", self.allowed_extensions or set(DEFAULT_ALLOWED_EXTENSIONS))
+        # Defaults are shared frozensets; only caller-supplied sets get copied
+        if self.excluded_dirs:
+            object.__setattr__(self, "excluded_dirs", frozenset(self.excluded_dirs))
+        else:
+            object.__setattr__(self, "excluded_dirs", DEFAULT_EXCLUDED_DIRS)
+        if self.allowed_extensions:
+            object.__setattr__(self, "allowed_extensions", frozenset(self.allowed_extensions))
+        else:
+            object.__setattr__(self, "allowed_extensions", DEFAULT_ALLOWED_EXTENSIONS)
 
+    # Derived matchers, built on first use and kept on the instance
+    # (cached_property writes __dict__ directly, so frozen=True is fine).
 
-def is_excluded_path(path: Path, rules: IngestRules) -> bool:
-    # Exclude any path that contains an excluded dir segment anywhere
-    for part in path.parts:
-        if part in rules.excluded_dirs:
-            return True
-    return False
+    @cached_property
+    def _excluded_glob_re(self) -> Optional[Pattern[str]]:
+        # excluded_dirs entries with glob chars (e.g. "*.egg-info", "build-*"),
+        # compiled into one alternation; None when every entry is a plain name
+        globs = sorted(d for d in self.excluded_dirs if not _GLOB_CHARS.isdisjoint(d))
+        if not globs:
+            return None
+        return re.compile("|".join(translate(g) for g in globs))
 
 
-def is_allowed_file(path: Path, rules: IngestRules) -> bool:
-    if path.suffix.lower() not in rules.allowed_extensions:
+def is_excluded_path(rel_parts: Tuple[str, ...], rules: IngestRules) -> bool:
+    # Exclude any path that contains an excluded dir segment anywhere
+    if not rules.excluded_dirs.isdisjoint(rel_parts):
+        return True
+    glob_re = rules._excluded_glob_re
+    if glob_re is None:
         return False
-    try:
-        if path.stat().st_size > rules.max_file_size_bytes:
-            return False
-    except FileNotFoundError:
+    # Directory segments only, so "build-*" doesn't catch a file "build-x.py".
+    # translate() anchors each pattern with \Z, so match() is a full match.
+    return any(glob_re.match(part) for part in rel_parts[:-1])
+
+
+def is_allowed_file(name: str, size: int, rules: IngestRules) -> bool:
+    # size comes from the zip central directory, so no stat() here.
+    # splitext (as in _ingest_zip) keeps Path.suffix semantics: a dotfile
+    # named ".py" has no extension.
+    if os.path.splitext(name)[1].lower() not in rules.allowed_extensions:
         return False
-    return True
\ No newline at end of file
+    return size <= rules.max_file_size_bytes
+
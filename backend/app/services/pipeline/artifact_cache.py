@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+from app.services.runners.runner_utils import run_command
+
+# Bump when tool flags, normalizers, metrics or scoring change output so old
+# entries stop matching. Installed tool versions are keyed separately (see
+# tool_versions).
+CACHE_VERSION = "v2"
+
+# Scan artifacts that depend only on the input files. ai/ and the trend point
+# embed scan_id / timestamps, so they are regenerated on every scan.
+CACHED_FILES = (
+    "raw/flake8.json",
+    "raw/bandit.json",
+    "normalized/flake8.normalized.json",
+    "normalized/bandit.normalized.json",
+    "normalized/unified_issues.json",
+    "metrics/metrics.json",
+    "score/score.json",
+)
+
+# Postprocess outputs reused whenever the raw tool reports match. Only the
+# scan-relative ones: per-tool normalized files hold absolute paths, so they
+# are always rebuilt from the scan's own reports.
+POSTPROCESS_FILES = (
+    "normalized/unified_issues.json",
+    "metrics/metrics.json",
+    "score/score.json",
+)
+
+# Stands in for the producing scan's path inside cached raw / per-tool
+# normalized reports; restore_artifacts swaps in the restoring scan's path.
+SCAN_PATH_PLACEHOLDER = b"@@SCAN_PATH@@"
+
+# Entries kept in storage/artifact_cache; least recently used go first.
+MAX_CACHE_ENTRIES = 200
+
+RAW_FILES = ("raw/flake8.json", "raw/bandit.json")
+
+# Parts of raw reports that change between runs without changing the findings
+_RAW_VOLATILE_RE = re.compile(rb'"generated_at":\s*"[^"]*"')
+
+
+def _cache_root(scan_path: Path) -> Path:
+    return scan_path.parent.parent / "artifact_cache"  # .../backend/storage
+
+
+def _scan_path_forms(scan_path: Path) -> Tuple[bytes, ...]:
+    """The scan path as it can appear in report bytes: raw and JSON-escaped."""
+    raw = str(scan_path).encode("utf-8")
+    escaped = json.dumps(str(scan_path))[1:-1].encode("utf-8")
+    return (raw,) if escaped == raw else (escaped, raw)
+
+
+@lru_cache(maxsize=1)
+def tool_versions() -> str:
+    """
+    `flake8 --version` + `bandit --version` output, checked once per process
+    (like flake8_runner._supports_jobs). flake8 lists its plugins there too,
+    so an upgrade of either tool stops old raw reports from matching.
+    """
+    parts = []
+    for tool in ("flake8", "bandit"):
+        try:
+            result = run_command([tool, "--version"], timeout_sec=30)
+            parts.append(f"{tool}:{result['returncode']}:{result['stdout'].strip()}")
+        except OSError:
+            parts.append(f"{tool}:missing")
+    return "\n".join(parts)
+
+
+def input_fingerprint(input_dir: Path) -> str:
+    """
+    sha256 over every file in input/ (relative path + content), walked in a
+    stable order. Identical uploads hash the same regardless of scan_id.
+    """
+    h = hashlib.sha256(CACHE_VERSION.encode("utf-8"))
+    h.update(tool_versions().encode("utf-8") + b"\0")
+
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            full = os.path.join(dirpath, name)
+            rel = os.path.relpath(full, input_dir).replace(os.sep, "/")
+            h.update(rel.encode("utf-8") + b"\0")
+            with open(full, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            h.update(b"\0")
+
+    return h.hexdigest()
+
+
+def raw_fingerprint(scan_path: Path) -> str:
+    """
+    sha256 over the raw tool reports, with this scan's own path and bandit's
+    timestamp neutralised so equal findings in another scan hash the same.
+    """
+    h = hashlib.sha256(f"postprocess:{CACHE_VERSION}".encode("utf-8"))
+    scan_prefix = str(scan_path).encode("utf-8")
+
+    for rel in RAW_FILES:
+        p = scan_path / rel
+        data = p.read_bytes() if p.exists() else b""
+        data = _RAW_VOLATILE_RE.sub(b"", data.replace(scan_prefix, b"<scan>"))
+        h.update(rel.encode("utf-8") + b"\0" + data + b"\0")
+
+    return h.hexdigest()
+
+
+def restore_artifacts(scan_path: Path, key: str, files: Tuple[str, ...] = CACHED_FILES) -> bool:
+    """Copy cached artifacts for `key` into the scan. False on cache miss."""
+    entry = _cache_root(scan_path) / key
+    meta = entry / "cache.json"
+    if not meta.exists():
+        return False
+
+    here = json.dumps(str(scan_path), ensure_ascii=False)[1:-1].encode("utf-8")
+    try:
+        for rel in files:
+            src = entry / rel
+            if src.exists():
+                dest = scan_path / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(src.read_bytes().replace(SCAN_PATH_PLACEHOLDER, here))
+        os.utime(meta)  # last use, for eviction
+    except OSError:
+        # Evicted mid-copy: treat as a miss, the caller rewrites every file
+        return False
+
+    return True
+
+
+def store_artifacts(
+    scan_path: Path,
+    key: str,
+    source: Optional[Dict[str, Any]] = None,
+    files: Tuple[str, ...] = CACHED_FILES,
+) -> None:
+    """
+    Save this scan's artifacts under `key`. Written to a temp folder and
+    renamed into place, so readers never see a partial entry.
+    """
+    root = _cache_root(scan_path)
+    entry = root / key
+    if entry.exists():
+        return
+
+    tmp = root / f"{key}.{uuid4().hex}.tmp"
+    path_forms = _scan_path_forms(scan_path)
+    try:
+        for rel in files:
+            src = scan_path / rel
+            if src.exists():
+                data = src.read_bytes()
+                for form in path_forms:
+                    data = data.replace(form, SCAN_PATH_PLACEHOLDER)
+                dest = tmp / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(data)
+
+        meta = {
+            "key": key,
+            "version": CACHE_VERSION,
+            "scan_id": scan_path.name,
+            "source": source,
+            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        }
+        tmp.mkdir(parents=True, exist_ok=True)
+        (tmp / "cache.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+        os.rename(tmp, entry)
+        _evict(root)
+    except OSError:
+        # Lost a race with another scan of the same input (or disk trouble);
+        # the cache is best-effort.
+        pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _evict(root: Path, keep: int = MAX_CACHE_ENTRIES) -> None:
+    """Drop the least recently used entries beyond `keep` (by cache.json mtime)."""
+    entries = []
+    with os.scandir(root) as it:
+        for e in it:
+            if not e.is_dir(follow_symlinks=False) or e.name.endswith(".tmp"):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(e.path, "cache.json")).st_mtime_ns, e.path))
+            except OSError:
+                continue
+
+    if len(entries) <= keep:
+        return
+
+    entries.sort()
+    for _, path in entries[: len(entries) - keep]:
+        shutil.rmtree(path, ignore_errors=True)
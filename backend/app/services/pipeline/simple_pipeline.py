@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:  # pragma: no cover
+    orjson = None
 
 from app.services.runners.bandit_runner import run_bandit
 from app.services.runners.flake8_runner import run_flake8
-from app.services.runners.runner_utils import write_json
+from app.services.runners.runner_utils import atomic_write_bytes, write_json
 
 from app.services.processors.normalize import (
     normalize_flake8,
@@ -18,17 +24,35 @@ from app.services.scoring.scoring import compute_score
 
 from app.services.history.trend import append_trend_point
 from app.services.ai.generator import generate_ai_outputs
+from app.services.pipeline.artifact_cache import (
+    POSTPROCESS_FILES,
+    input_fingerprint,
+    raw_fingerprint,
+    restore_artifacts,
+    store_artifacts,
+)
 
 
 def _read_json(p: Path) -> Optional[Any]:
     if not p.exists():
         return None
+    if orjson is not None:
+        return orjson.loads(p.read_bytes())
     return json.loads(p.read_text(encoding="utf-8"))
 
 
 def _write_json(p: Path, data: Any) -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # Pipeline artifacts are read by code (results API, caches): compact + atomic
+    if orjson is not None:
+        atomic_write_bytes(p, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        return
+    atomic_write_bytes(p, json.dumps(data).encode("utf-8"))
+
+
+_NORMALIZERS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "flake8": normalize_flake8,
+    "bandit": normalize_bandit,
+}
 
 
 def _to_scan_rel_path(path_str: str, scan_path: Path) -> str:
@@ -44,23 +68,59 @@ def _to_scan_rel_path(path_str: str, scan_path: Path) -> str:
         return s
 
 
-def postprocess_scan(scan_path: Path) -> Dict[str, Any]:
+def _normalize_raw(
+    raw_path: Path,
+    out_path: Path,
+    normalize: Callable[[Any], Dict[str, Any]],
+) -> Dict[str, Any]:
+    norm = normalize(_read_json(raw_path) or {})
+    _write_json(out_path, norm)
+    return norm
+
+
+def _normalize_all(raw_dir: Path, norm_dir: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # Read raw -> normalize -> write, per tool (independent, so side by side)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        flake8_future = pool.submit(
+            _normalize_raw,
+            raw_dir / "flake8.json",
+            norm_dir / "flake8.normalized.json",
+            normalize_flake8,
+        )
+        bandit_future = pool.submit(
+            _normalize_raw,
+            raw_dir / "bandit.json",
+            norm_dir / "bandit.normalized.json",
+            normalize_bandit,
+        )
+    return flake8_future.result(), bandit_future.result()
+
+
+def postprocess_scan(
+    scan_path: Path,
+    normalized: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    raw/ -> normalized/, metrics/, score/ (+ AI summary and trend point).
+    `normalized` is (flake8_norm, bandit_norm) when the caller already
+    normalized each report as its tool finished.
+    """
     raw_dir = scan_path / "raw"
     norm_dir = scan_path / "normalized"
     metrics_dir = scan_path / "metrics"
     score_dir = scan_path / "score"
 
-    # Read raw outputs
-    flake8_raw = _read_json(raw_dir / "flake8.json") or {}
-    bandit_raw = _read_json(raw_dir / "bandit.json") or {}
+    # Per-tool normalized files always come from this scan's own reports
+    # (they hold its absolute paths); only scan-relative outputs are reused.
+    if normalized is not None:
+        flake8_norm, bandit_norm = normalized
+    else:
+        flake8_norm, bandit_norm = _normalize_all(raw_dir, norm_dir)
 
-    # Normalize per-tool
-    flake8_norm = normalize_flake8(flake8_raw)
-    bandit_norm = normalize_bandit(bandit_raw)
-
-    # Write per-tool normalized
-    _write_json(norm_dir / "flake8.normalized.json", flake8_norm)
-    _write_json(norm_dir / "bandit.normalized.json", bandit_norm)
+    # Same raw reports seen before -> reuse unified_issues/metrics/score
+    raw_key = raw_fingerprint(scan_path)
+    if restore_artifacts(scan_path, raw_key, files=POSTPROCESS_FILES):
+        return _finish_cached(scan_path)
 
     # Unified issues
     unified = build_unified_issues(flake8_norm, bandit_norm)
@@ -80,6 +140,33 @@ def postprocess_scan(scan_path: Path) -> Dict[str, Any]:
     score = compute_score(metrics)
     _write_json(score_dir / "score.json", score)
 
+    store_artifacts(scan_path, raw_key, files=POSTPROCESS_FILES)
+
+    return _finish_scan(scan_path, unified, metrics, score)
+
+
+def _finish_cached(scan_path: Path) -> Dict[str, Any]:
+    """_finish_scan over artifacts just restored from the cache."""
+    return _finish_scan(
+        scan_path,
+        _read_json(scan_path / "normalized" / "unified_issues.json") or [],
+        _read_json(scan_path / "metrics" / "metrics.json") or {},
+        _read_json(scan_path / "score" / "score.json") or {},
+    )
+
+
+def _finish_scan(
+    scan_path: Path,
+    unified: List[Dict[str, Any]],
+    metrics: Dict[str, Any],
+    score: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Per-scan outputs (AI summary + trend point), also run on cache hits."""
+    raw_dir = scan_path / "raw"
+    norm_dir = scan_path / "normalized"
+    metrics_dir = scan_path / "metrics"
+    score_dir = scan_path / "score"
+
     # ✅ AI Summary (rule-based now, LLM later)
     # This writes: scan_path/ai/ai_summary.json
     generate_ai_outputs(
@@ -125,19 +212,54 @@ def run_tools_for_scan(scan_path: Path) -> Dict[str, Any]:
         write_json(
             warnings_file,
             {"error": "input directory not found", "input_dir": str(input_dir)},
+            pretty=True,
         )
         return {"status": "FAILED", "reason": "NO_INPUT_DIR"}
 
-    # Run tools -> raw/
-    run_flake8(input_dir=input_dir, out_json=raw_dir / "flake8.json", warnings_json=warnings_file)
-    run_bandit(input_dir=input_dir, out_json=raw_dir / "bandit.json", warnings_json=warnings_file)
+    # Identical input already scanned -> reuse its artifacts
+    cache_key = input_fingerprint(input_dir)
+    if restore_artifacts(scan_path, cache_key):
+        write_json(raw_dir / "runner_done.json", {"status": "DONE", "cached": True})
+        try:
+            post = _finish_cached(scan_path)
+            return {"status": "DONE", "cached": True, "postprocess": post}
+        except Exception as e:
+            write_json(raw_dir / "postprocess_error.json", {"error": str(e)}, pretty=True)
+            return {"status": "FAILED", "reason": "POSTPROCESS_ERROR", "error": str(e)}
+
+    # Run tools -> raw/ (independent subprocesses, so run them side by side).
+    # Each report is normalized as soon as its tool exits, hiding that work
+    # behind whichever tool is slower.
+    norm_dir = scan_path / "normalized"
+    norm_futures: Dict[str, Future] = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        tool_futures = {
+            pool.submit(runner, input_dir=input_dir, out_json=raw_dir / f"{tool}.json", warnings_json=warnings_file): tool
+            for tool, runner in (("flake8", run_flake8), ("bandit", run_bandit))
+        }
+        for f in as_completed(tool_futures):
+            f.result()  # re-raise runner errors, as the sequential calls did
+            tool = tool_futures[f]
+            norm_futures[tool] = pool.submit(
+                _normalize_raw,
+                raw_dir / f"{tool}.json",
+                norm_dir / f"{tool}.normalized.json",
+                _NORMALIZERS[tool],
+            )
 
     write_json(raw_dir / "runner_done.json", {"status": "DONE"})
 
     # Postprocess
     try:
-        post = postprocess_scan(scan_path)
-        return {"status": "DONE", "postprocess": post}
+        normalized = (norm_futures["flake8"].result(), norm_futures["bandit"].result())
+        post = postprocess_scan(scan_path, normalized=normalized)
     except Exception as e:
-        write_json(raw_dir / "postprocess_error.json", {"error": str(e)})
-        return {"status": "FAILED", "reason": "POSTPROCESS_ERROR", "error": str(e)}
\ No newline at end of file
+        write_json(raw_dir / "postprocess_error.json", {"error": str(e)}, pretty=True)
+        return {"status": "FAILED", "reason": "POSTPROCESS_ERROR", "error": str(e)}
+
+    # Only cache clean runs (tool failures land in runner_warnings.json)
+    if not warnings_file.exists():
+        ingestion = _read_json(raw_dir / "ingestion.json") or {}
+        store_artifacts(scan_path, cache_key, source=ingestion.get("source"))
+
+    return {"status": "DONE", "postprocess": post}
\ No newline at end of file
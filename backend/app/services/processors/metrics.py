@@ -1,24 +1,64 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import heapq
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
 
+SEVERITIES = ("low", "medium", "high")
 
-def _count_by_tool(unified_issues: List[Dict[str, Any]]) -> Dict[str, int]:
-    counts: Dict[str, int] = {}
-    for issue in unified_issues:
-        tool = str(issue.get("tool") or "unknown").lower()
-        counts[tool] = counts.get(tool, 0) + 1
-    return counts
+# severity -> slot in the per-file [low, medium, high] counters (unknown -> low)
+_SEV_IDX = {"low": 0, "medium": 1, "high": 2}.get
 
 
-def _count_by_severity(unified_issues: List[Dict[str, Any]]) -> Dict[str, int]:
-    counts = {"low": 0, "medium": 0, "high": 0}
-    for issue in unified_issues:
-        severity = str(issue.get("severity") or "low").lower()
-        if severity not in counts:
-            severity = "low"
-        counts[severity] += 1
-    return counts
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        # Malformed report field (list/dict): keep what str(value or default) sees
+        return str(value) if value else None
+
+
+def _raw_key(issue: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    get = issue.get
+    return get("tool"), get("severity"), get("rule_id"), get("file")
+
+
+def _tally(unified_issues: List[Dict[str, Any]]) -> Counter[Tuple[Any, Any, Any, Any]]:
+    """Issue counts per distinct raw (tool, severity, rule_id, file)."""
+    try:
+        return Counter(map(_raw_key, unified_issues))
+    except TypeError:
+        return Counter(tuple(map(_hashable, _raw_key(issue))) for issue in unified_issues)
+
+
+def _aggregate(
+    unified_issues: List[Dict[str, Any]],
+) -> Tuple[Dict[str, int], List[int], Dict[str, List[int]], Dict[str, int]]:
+    """
+    One pass over unified issues. Returns (by_tool, severity_counts,
+    per_file_counts, rule_counts); severity counts are [low, medium, high].
+
+    Issues are first tallied per distinct raw field combination, so the
+    str/lower/upper clean-up runs once per combination rather than per issue.
+    First-seen order is kept, so dict key order matches a per-issue pass.
+    """
+    by_tool: Counter[str] = Counter()
+    sev_counts = [0, 0, 0]
+    files: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+    rule_counts: Counter[str] = Counter()
+
+    for (tool, severity, rule_id, file_path), n in _tally(unified_issues).items():
+        tool = str(tool or "unknown").lower()
+        idx = _SEV_IDX(str(severity or "low").lower(), 0)
+        rule_key = f"{tool}:{str(rule_id or 'unknown').upper()}"
+
+        by_tool[tool] += n
+        sev_counts[idx] += n
+        files[str(file_path or "unknown")][idx] += n
+        rule_counts[rule_key] += n
+
+    return by_tool, sev_counts, files, rule_counts
 
 
 def _extract_loc(tool_outputs: List[Dict[str, Any]]) -> int:
@@ -31,91 +71,48 @@ def _extract_loc(tool_outputs: List[Dict[str, Any]]) -> int:
     return 0
 
 
-def _heatmap(unified_issues: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
-    out: Dict[str, Dict[str, int]] = {}
-    for issue in unified_issues:
-        file_path = str(issue.get("file") or "unknown")
-        severity = str(issue.get("severity") or "low").lower()
-        if severity not in {"low", "medium", "high"}:
-            severity = "low"
-
-        if file_path not in out:
-            out[file_path] = {"low": 0, "medium": 0, "high": 0}
-        out[file_path][severity] += 1
-    return out
-
-
 def _top_files(
-    heatmap: Dict[str, Dict[str, int]],
+    files: Dict[str, List[int]],
     limit: int = 10,
 ) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
+    top = heapq.nlargest(limit, files.items(), key=lambda kv: (sum(kv[1]), kv[0]))
+    return [
+        {"file": file_path, "count": sum(counts), "issues": sum(counts)}
+        for file_path, counts in top
+    ]
 
-    for file_path, counts in heatmap.items():
-        total = int(counts.get("low", 0)) + int(counts.get("medium", 0)) + int(
-            counts.get("high", 0)
-        )
-        rows.append(
-            {
-                "file": file_path,
-                "count": total,
-                "issues": total,
-            }
-        )
 
-    rows.sort(key=lambda item: (item["count"], item["file"]), reverse=True)
-    return rows[:limit]
+def _weighted_risk(counts: List[int]) -> int:
+    low, medium, high = counts
+    return (high * 5) + (medium * 3) + low
 
 
 def _top_refactor_priority(
-    heatmap: Dict[str, Dict[str, int]],
+    files: Dict[str, List[int]],
     limit: int = 5,
 ) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-
-    for file_path, counts in heatmap.items():
-        low = int(counts.get("low", 0))
-        medium = int(counts.get("medium", 0))
-        high = int(counts.get("high", 0))
-        weighted_risk = (high * 5) + (medium * 3) + low
-
-        rows.append(
-            {
-                "file": file_path,
-                "weighted_risk": weighted_risk,
-                "counts": {
-                    "low": low,
-                    "medium": medium,
-                    "high": high,
-                },
-            }
-        )
-
-    rows.sort(
-        key=lambda item: (item["weighted_risk"], item["file"]),
-        reverse=True,
+    top = heapq.nlargest(
+        limit,
+        files.items(),
+        key=lambda kv: (_weighted_risk(kv[1]), kv[0]),
     )
-    return rows[:limit]
+    return [
+        {
+            "file": file_path,
+            "weighted_risk": _weighted_risk(counts),
+            "counts": dict(zip(SEVERITIES, counts)),
+        }
+        for file_path, counts in top
+    ]
 
 
 def _most_recurring_issues(
-    unified_issues: List[Dict[str, Any]],
+    rule_counts: Dict[str, int],
     limit: int = 10,
 ) -> List[Dict[str, Any]]:
-    counts: Dict[str, int] = {}
-
-    for issue in unified_issues:
-        tool = str(issue.get("tool") or "unknown").lower()
-        rule_id = str(issue.get("rule_id") or "unknown").upper()
-        key = f"{tool}:{rule_id}"
-        counts[key] = counts.get(key, 0) + 1
-
-    rows = [
-        {"rule_id": key, "count": value}
-        for key, value in counts.items()
-    ]
-    rows.sort(key=lambda item: (item["count"], item["rule_id"]), reverse=True)
-    return rows[:limit]
+    # Not Counter.most_common: ties must keep breaking on rule_id, not insertion order
+    top = heapq.nlargest(limit, rule_counts.items(), key=lambda kv: (kv[1], kv[0]))
+    return [{"rule_id": key, "count": value} for key, value in top]
 
 
 def build_metrics(
@@ -124,20 +121,21 @@ def build_metrics(
 ) -> Dict[str, Any]:
     unified = unified_issues or []
     loc = _extract_loc(tool_outputs)
-    by_tool = _count_by_tool(unified)
-    by_severity = _count_by_severity(unified)
-    heatmap = _heatmap(unified)
+    by_tool, sev_counts, files, rule_counts = _aggregate(unified)
+
+    # Only the projection step builds the named-severity dicts
+    heatmap = {file_path: dict(zip(SEVERITIES, counts)) for file_path, counts in files.items()}
 
     return {
         "metrics_version": "v1",
         "totals": {
             "issues": len(unified),
-            "by_tool": by_tool,
-            "by_severity": by_severity,
+            "by_tool": dict(by_tool),
+            "by_severity": dict(zip(SEVERITIES, sev_counts)),
             "loc": loc,
         },
-        "top_refactor_priority": _top_refactor_priority(heatmap, limit=5),
+        "top_refactor_priority": _top_refactor_priority(files, limit=5),
         "heatmap": heatmap,
-        "most_recurring_issues": _most_recurring_issues(unified, limit=10),
-        "top_files": _top_files(heatmap, limit=10),
-    }
\ No newline at end of file
+        "most_recurring_issues": _most_recurring_issues(rule_counts, limit=10),
+        "top_files": _top_files(files, limit=10),
+    }
@@ -4,82 +4,62 @@ import json
 from typing import Any, Dict, List
 
 
-def _map_flake8_category(code: str) -> str:
-    if not code:
-        return "style"
+# flake8 code prefix -> category (anything else is style)
+_CATEGORY_BY_PREFIX = {
+    "F": "bug_risk",
+    "E": "style",
+    "W": "style",
+    "C": "maintainability",
+}
+
+# MVP severity mapping for flake8.
+#   High:   syntax / execution-breaking / undefined-name style issues
+#   Medium: bug-risk / import / structure issues (and any other F code)
+#   Low:    style / formatting / hygiene
+_HIGH_CODES = frozenset({
+    "E999",  # syntax error
+    "F821",  # undefined name
+    "F823",  # local variable referenced before assignment
+    "F831",  # duplicate argument name
+    "F706",  # return outside function
+    "F704",  # yield outside function
+})
+
+_MEDIUM_CODES = frozenset({
+    "F401",
+    "F402",
+    "F403",
+    "F405",
+    "F541",
+    "F621",
+    "F622",
+    "F631",
+    "F632",
+    "F707",
+    "F722",
+    "F822",
+    "E701",
+    "E702",
+    "E711",
+    "E712",
+    "E302",
+    "E305",
+    "E401",
+    "E402",
+})
 
-    if code.startswith("F"):
-        return "bug_risk"
 
+def _map_flake8_category(code: str) -> str:
     if code == "E999":
         return "bug_risk"
-
-    if code.startswith(("E", "W")):
-        return "style"
-
-    if code.startswith("C"):
-        return "maintainability"
-
-    return "style"
+    return _CATEGORY_BY_PREFIX.get(code[:1], "style")
 
 
 def _map_flake8_severity(code: str) -> str:
-    """
-    MVP severity mapping for flake8.
-
-    High:
-      - syntax / execution-breaking / undefined-name style issues
-
-    Medium:
-      - bug-risk / import / structure issues
-
-    Low:
-      - style / formatting / hygiene
-    """
-    if not code:
-        return "low"
-
-    high_codes = {
-        "E999",  # syntax error
-        "F821",  # undefined name
-        "F823",  # local variable referenced before assignment
-        "F831",  # duplicate argument name
-        "F706",  # return outside function
-        "F704",  # yield outside function
-    }
-
-    medium_codes = {
-        "F401",
-        "F402",
-        "F403",
-        "F405",
-        "F541",
-        "F621",
-        "F622",
-        "F631",
-        "F632",
-        "F707",
-        "F722",
-        "F822",
-        "E701",
-        "E702",
-        "E711",
-        "E712",
-        "E302",
-        "E305",
-        "E401",
-        "E402",
-    }
-
-    if code in high_codes:
+    if code in _HIGH_CODES:
         return "high"
-
-    if code in medium_codes:
+    if code in _MEDIUM_CODES or code[:1] == "F":
         return "medium"
-
-    if code.startswith("F"):
-        return "medium"
-
     return "low"
 
 
@@ -91,6 +71,7 @@ def normalize_flake8(raw: Any) -> Dict[str, Any]:
             raw = {}
 
     issues: List[Dict[str, Any]] = []
+    append = issues.append  # hot loop: one record per issue
 
     if isinstance(raw, dict):
         for file_path, file_issues in raw.items():
@@ -101,18 +82,19 @@ def normalize_flake8(raw: Any) -> Dict[str, Any]:
                 if not isinstance(item, dict):
                     continue
 
-                code = str(item.get("code") or "").strip().upper()
+                get = item.get
+                code = str(get("code") or "").strip().upper()
 
-                issues.append(
+                append(
                     {
                         "tool": "flake8",
                         "rule_id": code,
                         "category": _map_flake8_category(code),
                         "severity": _map_flake8_severity(code),
                         "confidence": None,
-                        "file": item.get("filename") or file_path,
-                        "line": item.get("line_number"),
-                        "message": item.get("text"),
+                        "file": get("filename") or file_path,
+                        "line": get("line_number"),
+                        "message": get("text"),
                     }
                 )
 
@@ -133,24 +115,23 @@ def normalize_bandit(raw: Any) -> Dict[str, Any]:
     results = raw.get("results", []) if isinstance(raw, dict) else []
 
     issues: List[Dict[str, Any]] = []
+    append = issues.append  # hot loop: one record per issue
 
     for item in results:
         if not isinstance(item, dict):
             continue
 
-        severity = str(item.get("issue_severity") or "low").lower()
-        confidence = str(item.get("issue_confidence") or "low").lower()
-
-        issues.append(
+        get = item.get
+        append(
             {
                 "tool": "bandit",
-                "rule_id": item.get("test_id"),
+                "rule_id": get("test_id"),
                 "category": "security",
-                "severity": severity,
-                "confidence": confidence,
-                "file": item.get("filename"),
-                "line": item.get("line_number"),
-                "message": item.get("issue_text"),
+                "severity": str(get("issue_severity") or "low").lower(),
+                "confidence": str(get("issue_confidence") or "low").lower(),
+                "file": get("filename"),
+                "line": get("line_number"),
+                "message": get("issue_text"),
             }
         )
 
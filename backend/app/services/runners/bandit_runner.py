@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from app.services.runners.runner_utils import run_command, write_json
+from app.services.runners.runner_utils import (
+    run_json_command,
+    write_json,
+    write_tool_warning,
+)
 
 
 def run_bandit(input_dir: Path, out_json: Path, warnings_json: Path) -> None:
@@ -19,17 +23,13 @@ def run_bandit(input_dir: Path, out_json: Path, warnings_json: Path) -> None:
         "--exit-zero"  # do not fail pipeline due to findings
     ]
 
-    result = run_command(cmd, timeout_sec=180)
-
-    # bandit json is in stdout
-    if result["stdout"].strip():
-        try:
-            write_json(out_json, result["stdout"] and __import__("json").loads(result["stdout"]))
-        except Exception:
-            write_json(warnings_json, {"tool": "bandit", "warning": "Invalid JSON output", **result})
-            write_json(out_json, {})
-    else:
+    # bandit json is in stdout; streamed into out_json once it parses
+    result, has_output, bad_output = run_json_command(cmd, out_json, timeout_sec=180)
+    if bad_output:
+        write_tool_warning(warnings_json, "bandit", {"tool": "bandit", "warning": "Invalid JSON output", **result, "stdout": bad_output})
+        write_json(out_json, {})
+    elif not has_output:
         write_json(out_json, {})
 
     if not result["ok"] and result["stderr"].strip():
-        write_json(warnings_json, {"tool": "bandit", "warning": "Non-zero return", **result})
\ No newline at end of file
+        write_tool_warning(warnings_json, "bandit", {"tool": "bandit", "warning": "Non-zero return", **result})
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
-import json
+import os
+from functools import lru_cache
 from pathlib import Path
 
-from app.services.runners.runner_utils import run_command, write_json
+from app.services.runners.runner_utils import (
+    run_command,
+    run_json_command,
+    write_json,
+    write_tool_warning,
+)
+
+
+@lru_cache(maxsize=1)
+def _supports_jobs() -> bool:
+    """
+    Whether the installed flake8 accepts --jobs (checked once per process).
+    Older or stripped-down installs fall back to a single process.
+    """
+    result = run_command(["flake8", "--help"], timeout_sec=30)
+    return "--jobs" in result["stdout"]
 
 
 def run_flake8(input_dir: Path, out_json: Path, warnings_json: Path) -> None:
@@ -15,21 +31,19 @@ def run_flake8(input_dir: Path, out_json: Path, warnings_json: Path) -> None:
         "flake8",
         str(input_dir),
         "--format=json",
-        "--exit-zero",  # do not fail pipeline even if issues exist
     ]
+    if _supports_jobs():
+        cmd.append(f"--jobs={os.cpu_count() or 'auto'}")
+    cmd.append("--exit-zero")  # do not fail pipeline even if issues exist
 
-    result = run_command(cmd, timeout_sec=120)
-
-    # flake8-json prints JSON to stdout
-    if result["stdout"].strip():
-        try:
-            parsed = json.loads(result["stdout"])
-            write_json(out_json, parsed)
-        except Exception:
-            # fallback: save raw stdout if parsing fails
-            write_json(warnings_json, {"tool": "flake8", "warning": "Invalid JSON output", **result})
-    else:
+    # flake8-json prints JSON to stdout; streamed into out_json once it parses
+    result, has_output, bad_output = run_json_command(cmd, out_json, timeout_sec=120)
+    if bad_output:
+        # no report (and no stale one); postprocess treats a missing report as empty
+        out_json.unlink(missing_ok=True)
+        write_tool_warning(warnings_json, "flake8", {"tool": "flake8", "warning": "Invalid JSON output", **result, "stdout": bad_output})
+    elif not has_output:
         write_json(out_json, {})  # no issues found (or no output)
 
     if not result["ok"] and result["stderr"].strip():
-        write_json(warnings_json, {"tool": "flake8", "warning": "Non-zero return", **result})
\ No newline at end of file
+        write_tool_warning(warnings_json, "flake8", {"tool": "flake8", "warning": "Non-zero return", **result})
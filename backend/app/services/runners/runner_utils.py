@@ -1,28 +1,58 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
+from uuid import uuid4
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:  # pragma: no cover
+    orjson = None
 
-def run_command(cmd: list[str], timeout_sec: int = 60) -> dict[str, Any]:
+# flake8 and bandit run concurrently and both merge into runner_warnings.json
+_WARNINGS_LOCK = threading.Lock()
+
+
+def run_command(
+    cmd: list[str],
+    timeout_sec: int = 60,
+    stdout_path: Optional[Path] = None,
+) -> dict[str, Any]:
     """
     Runs a CLI command with timeout and captures stdout/stderr.
     Returns a structured dict so we can save warnings/errors cleanly.
+
+    With stdout_path, stdout is streamed straight into that file instead of
+    being buffered in memory ("stdout" in the result is then empty).
     """
     try:
-        p = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout_sec,
-            check=False,
-        )
+        if stdout_path is None:
+            p = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout_sec,
+                check=False,
+            )
+        else:
+            stdout_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(stdout_path, "wb") as out:
+                p = subprocess.run(
+                    cmd,
+                    stdout=out,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=timeout_sec,
+                    check=False,
+                )
         return {
             "ok": p.returncode == 0,
             "returncode": p.returncode,
-            "stdout": p.stdout,
+            "stdout": p.stdout or "",
             "stderr": p.stderr,
             "cmd": cmd,
         }
@@ -36,6 +66,86 @@ def run_command(cmd: list[str], timeout_sec: int = 60) -> dict[str, Any]:
         }
 
 
-def write_json(path: Path, data: Any) -> None:
+def read_json_output(path: Path) -> tuple[bool, str]:
+    """
+    Check a tool's streamed JSON output file.
+    Returns (has_output, error); error is "" when the file parses.
+    """
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return False, ""
+    if not data.strip():
+        return False, ""
+    try:
+        orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
+        return True, data.decode("utf-8", errors="replace")
+    return True, ""
+
+
+def run_json_command(
+    cmd: list[str],
+    out_json: Path,
+    timeout_sec: int = 60,
+) -> tuple[dict[str, Any], bool, str]:
+    """
+    run_command with stdout streamed into a temp file next to out_json.
+    The file only replaces out_json once it parses, so readers never see an
+    empty or partial report while the tool runs.
+    Returns (result, has_output, error) as run_command + read_json_output.
+    """
+    tmp = out_json.with_name(f"{out_json.name}.{uuid4().hex}.tmp")
+    try:
+        result = run_command(cmd, timeout_sec=timeout_sec, stdout_path=tmp)
+        has_output, bad_output = read_json_output(tmp)
+        if has_output and not bad_output:
+            os.replace(tmp, out_json)
+        return result, has_output, bad_output
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write to a temp file next to `path`, then os.replace() it into place, so
+    readers never see a truncated file (crash, power loss, concurrent write).
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
\ No newline at end of file
+    tmp = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _dumps(data: Any, pretty: bool) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if pretty else None, ensure_ascii=False).encode("utf-8")
+
+
+def write_json(path: Path, data: Any, pretty: bool = False) -> None:
+    """Compact by default; pretty=True for files people read (warnings/errors)."""
+    atomic_write_bytes(path, _dumps(data, pretty))
+
+
+def write_tool_warning(path: Path, tool: str, warning: dict[str, Any]) -> None:
+    """
+    Store `warning` under the tool's key in the shared warnings file, keeping
+    the other tool's entry. The read-merge-write runs under one lock so
+    concurrent runners can't drop each other's warning.
+    """
+    with _WARNINGS_LOCK:
+        try:
+            data = path.read_bytes()
+            merged = orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            merged = {}
+        if not isinstance(merged, dict):
+            merged = {}
+        merged[tool] = warning
+        atomic_write_bytes(path, _dumps(merged, pretty=True))
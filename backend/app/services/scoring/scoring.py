@@ -4,6 +4,12 @@ import math
 from typing import Any, Dict
 
 
+# tuned multipliers (balanced profile)
+A_LOW = 6.0
+A_MED = 14.0
+A_HIGH = 45.0
+
+
 def clamp(x: float, lo: float = 0.0, hi: float = 100.0) -> float:
     return max(lo, min(hi, x))
 
@@ -64,26 +70,27 @@ def compute_score(metrics: Dict[str, Any]) -> Dict[str, Any]:
 
     loc = max(1, _get_loc(metrics))
 
-    # densities (per 1000 LOC)
-    d_low = (low / loc) * 1000.0
-    d_med = (medium / loc) * 1000.0
-    d_high = (high / loc) * 1000.0
-
-    # tuned multipliers (balanced profile)
-    A_LOW = 6.0
-    A_MED = 14.0
-    A_HIGH = 45.0
-
-    # diminishing returns penalty
-    p_low = A_LOW * math.log1p(d_low)
-    p_med = A_MED * math.log1p(d_med)
-    p_high = A_HIGH * math.log1p(d_high)
-
-    penalty = p_low + p_med + p_high
-    final_score = clamp(100.0 - penalty, 0.0, 100.0)
-    final_score_rounded = round(final_score, 2)
-
-    risk_level = _risk_level_from_score(final_score_rounded)
+    if low or medium or high:
+        # densities (per 1000 LOC)
+        d_low = (low / loc) * 1000.0
+        d_med = (medium / loc) * 1000.0
+        d_high = (high / loc) * 1000.0
+
+        # diminishing returns penalty
+        p_low = A_LOW * math.log1p(d_low)
+        p_med = A_MED * math.log1p(d_med)
+        p_high = A_HIGH * math.log1p(d_high)
+
+        penalty = p_low + p_med + p_high
+        final_score_rounded = round(clamp(100.0 - penalty, 0.0, 100.0), 2)
+        risk_level = _risk_level_from_score(final_score_rounded)
+    else:
+        # Clean scan: same numbers the formula gives, without the math
+        d_low = d_med = d_high = 0.0
+        p_low = p_med = p_high = 0.0
+        penalty = 0.0
+        final_score_rounded = 100.0
+        risk_level = "Low Risk"
 
     return {
         "final_score": final_score_rounded,